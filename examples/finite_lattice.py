@@ -24,32 +24,36 @@ quantities in normalized units
 
 def lattice_potential(xi, v0, n):
     '''lattice potential in normalized units.'''
-    
+
     # condition for point inside lattice
     cond = np.logical_and(0 < xi, xi < n)
-    
-    # return potential
-    return np.where(cond, v0 * np.sin(np.pi*xi)**2, 0)
 
+    # evaluate potential only inside lattice. avoids the transcendental
+    # work and full-size temporaries of evaluating sin everywhere
+    v = np.zeros_like(xi)
+    v[cond] = v0 * np.sin(np.pi*xi[cond])**2
 
+    return v
+
+
+
+def plot_basic(xi, v, eps, T):
+    '''plot lattice potential and transmission probability T.'''
 
-def plot_basic(xi, v, eps, t):
-    '''plot lattice potential and transmission.'''
-    
     # create figure and axes
-    fig, axs = pp.subplots(ncols=2, sharey=True, 
+    fig, axs = pp.subplots(ncols=2, sharey=True,
         gridspec_kw=dict(width_ratios=[3, 1]))
-    
-    
+
+
     # plot finite lattice potential
     axs[0].fill_between(xi, v, color='0.7')
     axs[0].plot(xi, v, color='k')
-    
-    
+
+
     # plot transmission probabilities
-    axs[1].fill_betweenx(eps, np.abs(t)**2, color='0.7')
-    axs[1].plot(np.abs(t)**2, eps, c='k')
-    
+    axs[1].fill_betweenx(eps, T, color='0.7')
+    axs[1].plot(T, eps, c='k')
+
     return fig, axs
 
 
@@ -97,19 +101,18 @@ v = lattice_potential(xi, v0, n=6)
 # calculate reflection and transmission amplitudes
 r, t = transport.amplitudes(eps_transmission, v, dxi, left=True)
 
+# transmission probability computed once and
+# shared by both plotted figures
+T = transport.abs2(t)
 
-# array stores wave functions for each particle energy
-psi = np.empty((eps_wavefunction.size, xi.size), dtype=complex)
 
-for i, eps in enumerate(eps_wavefunction):
-    
-    # calculate scattering wave function
-    psi[i] = transport.wavefunction(eps, v, dxi, left=True)
+# calculate scattering wave functions for all particle energies at once
+psi = transport.wavefunctions(eps_wavefunction, v, dxi, left=True)
 
 
 
 # function defines plotted quantity of wave functions
-funcs = [np.real, lambda x: np.abs(x)**2]
+funcs = [np.real, transport.abs2]
 
 # corresponding axis label for funcs
 ylabels = [
@@ -121,7 +124,7 @@ ylabels = [
 for func, ylabel in zip(funcs, ylabels):
     
     # plot lattice potential, transmission and wave functions
-    fig, axs = plot_basic(xi, v, eps_transmission, t)
+    fig, axs = plot_basic(xi, v, eps_transmission, T)
     plot_wavefunction(fig, axs, xi, eps_wavefunction, psi, colors, func)
     
     # set plotting limits
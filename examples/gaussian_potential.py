@@ -4,6 +4,8 @@
 import transport
 import numpy as np
 
+from scipy.special import expit
+
 import matplotlib.pyplot as pp
 
 
@@ -27,8 +29,15 @@ quantities in normalized units
 
 def gaussian_potential(xi, v0):
     '''gaussian potential in normalized units.'''
-    
-    return v0 * np.exp(-2*xi*xi)
+
+    return v0 * gaussian_shape(xi)
+
+
+
+def gaussian_shape(xi):
+    '''gaussian envelope shared by all potential heights.'''
+
+    return np.exp(-2*xi*xi)
 
 
 
@@ -40,8 +49,10 @@ def parabolic_transmission(e, v0):
     * T. Ihn, Semiconductor Nanostructures (Oxford University, 2010)
     '''
     
+    # sigmoid via expit, which avoids overflow in the
+    # exponent for energies far below a high barrier
     arg = -np.pi / np.sqrt(2.0 * v0) * (e - v0)
-    return 1.0 / (1.0 + np.exp(arg))
+    return expit(-arg)
 
 
 
@@ -63,11 +74,16 @@ xi, dxi = np.linspace(-5, 5, 500, retstep=True)
 
 
 
+# gaussian envelope computed once: only the height
+# changes between the plotted potentials
+shape = gaussian_shape(xi)
+
+
 for c, v0 in zip(colors, v0_list):
-    
-    # gaussian scattering potentials
-    v_gauss = gaussian_potential(xi, v0)
-    
+
+    # gaussian scattering potential
+    v_gauss = v0 * shape
+
     # calculate reflection and transmission amplitudes
     r_gauss, t_gauss = transport.amplitudes(eps, v_gauss, dxi, left=False)
     
@@ -77,8 +93,8 @@ for c, v0 in zip(colors, v0_list):
     
     
     # plot transmission probabilities
-    pp.plot(eps, np.abs(t_gauss)**2, ls='solid', c=c, label=str(v0))
-    pp.plot(eps, np.abs(t_parab)**2, ls='dashed', c=c)
+    pp.plot(eps, transport.abs2(t_gauss), ls='solid', c=c, label=str(v0))
+    pp.plot(eps, transport.abs2(t_parab), ls='dashed', c=c)
 
 
 
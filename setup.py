@@ -25,6 +25,10 @@ setup(
     packages=['transport'], 
     
     # required packages
-    install_requires=['numpy'], 
-    extras_require={'examples': ['matplotlib'], }
+    install_requires=['numpy'],
+    extras_require={
+        'examples': ['matplotlib', 'scipy'],
+        # just-in-time compilation of the hot solver recurrences
+        'fast': ['numba'],
+    }
 )
@@ -1,12 +1,22 @@
 # -*- coding: utf-8 -*-
 
 
+import functools
+
 import pytest
 import numpy as np
 from transport import scatter1d
 
 
 
+@functools.lru_cache(maxsize=None)
+def sampling_points(l, n):
+    '''sampling points x and step size dx shared across test cases.'''
+
+    return np.linspace(0, l, n, retstep=True)
+
+
+
 @pytest.mark.parametrize('e', [0.1, 0.2, 1.0, 1.1])
 @pytest.mark.parametrize('l', [10, ])
 @pytest.mark.parametrize('n', [230, ])
@@ -23,7 +33,7 @@ def test_amplitudes_zero_potential(e, l, n, left):
     v = np.zeros(n)
     
     # sampling points
-    x, dx = np.linspace(0, l, n, retstep=True)
+    x, dx = sampling_points(l, n)
     
     # numerical reflection and transmission amplitudes
     r_num, t_num = scatter1d.amplitudes(e, v, dx, left)
@@ -47,7 +57,7 @@ def test_wavefunction_zero_potential(e, l, n, left):
     v = np.zeros(n)
     
     # sampling points
-    x, dx = np.linspace(0, l, n, retstep=True)
+    x, dx = sampling_points(l, n)
     
     # numerical scattering wave function
     y_num = scatter1d.wavefunction(e, v, dx, left)
@@ -79,13 +89,13 @@ def test_amplitudes_rectangular_potential(e, v0, l, n, left):
     v = np.full(n, v0)
     
     # sampling points
-    x, dx = np.linspace(0, l, n, retstep=True)
+    x, dx = sampling_points(l, n)
     
     # numerical reflection and transmission amplitudes
     r_num, t_num = scatter1d.amplitudes(e, v, dx, left)
     
     # exact analytical reflection and transmission amplitudes
-    r_ex, t_ex, _ = rectangular_barrier(e, v0, l, x, left)
+    r_ex, t_ex, _ = rectangular_barrier(e, v0, l, n, left)
     
     # compare numerical and analytical solutions
     assert np.isclose(r_num, r_ex, atol=1e-4)
@@ -106,13 +116,13 @@ def test_wavefunction_rectangular_potential(e, v0, l, n, left):
     v = np.full(n, v0)
     
     # sampling points
-    x, dx = np.linspace(0, l, n, retstep=True)
+    x, dx = sampling_points(l, n)
     
     # numerical scattering wave function
     y_num = scatter1d.wavefunction(e, v, dx, left)
     
     # exact analytical wave function
-    y_ex = rectangular_barrier(e, v0, l, x, left)[2]
+    y_ex = rectangular_barrier(e, v0, l, n, left)[2]
     
     
     # compare numerical and analytical solutions
@@ -120,9 +130,266 @@ def test_wavefunction_rectangular_potential(e, v0, l, n, left):
 
 
 
-def rectangular_barrier(e, v0, l, x, left):
-    '''exact wave function and amplitudes for rectangular potential.'''
-    
+@pytest.mark.parametrize('v0', [1.0, 1.0-0.5j])
+@pytest.mark.parametrize('l', [10, ])
+@pytest.mark.parametrize('n', [230, ])
+@pytest.mark.parametrize('left', [False, True])
+
+def test_wavefunctions_several_energies(v0, l, n, left):
+    '''checks vectorized wave functions against single-energy results.'''
+
+    # particle energies
+    e = np.array([0.3, 0.8, 1.5])
+
+    # sampling points
+    x, dx = sampling_points(l, n)
+
+    # smooth scattering potential
+    v = v0 * np.sin(np.pi*x/l)**2
+
+    # wave functions for all energies at once
+    y_batch = scatter1d.wavefunctions(e, v, dx, left)
+
+    # check shape of vectorized result
+    assert y_batch.shape == (e.size, n)
+
+    # compare with wave functions calculated one energy at a time
+    for i in range(e.size):
+        y_single = scatter1d.wavefunction(e[i], v, dx, left)
+        assert np.allclose(y_batch[i], y_single)
+
+    # reduced variants return float arrays matching the complex result
+    y_real = scatter1d.wavefunctions(e, v, dx, left, part='real')
+    y_abs2 = scatter1d.wavefunctions(e, v, dx, left, part='abs2')
+
+    assert not np.iscomplexobj(y_real)
+    assert not np.iscomplexobj(y_abs2)
+
+    assert np.allclose(y_real, y_batch.real)
+    assert np.allclose(y_abs2, np.abs(y_batch)**2)
+
+
+
+@pytest.mark.parametrize('v0', [1.0, 1.0-0.5j])
+@pytest.mark.parametrize('l', [10, ])
+@pytest.mark.parametrize('n', [230, ])
+@pytest.mark.parametrize('left', [False, True])
+
+def test_amplitudes_several_energies(v0, l, n, left):
+    '''checks vectorized amplitudes against single-energy results.'''
+
+    # particle energies
+    e = np.array([0.3, 0.8, 1.5])
+
+    # sampling points
+    x, dx = sampling_points(l, n)
+
+    # smooth scattering potential
+    v = v0 * np.sin(np.pi*x/l)**2
+
+    # amplitudes for all energies at once
+    r_batch, t_batch = scatter1d.amplitudes(e, v, dx, left)
+
+    # compare with amplitudes calculated one energy at a time
+    for i in range(e.size):
+        r_single, t_single = scatter1d.amplitudes(e[i], v, dx, left)
+        assert np.allclose(r_batch[i], r_single)
+        assert np.allclose(t_batch[i], t_single)
+
+
+
+@pytest.mark.parametrize('l', [10, ])
+@pytest.mark.parametrize('n', [230, ])
+@pytest.mark.parametrize('left', [False, True])
+
+def test_amplitudes_real_potential(l, n, left):
+    '''checks real potentials against their complex representation.
+
+    real potentials keep the solver coefficients real and take a
+    cheaper kernel; the result must match the complex-valued route.
+    '''
+
+    # particle energies
+    e = np.array([0.3, 0.8, 1.5])
+
+    # sampling points
+    x, dx = sampling_points(l, n)
+
+    # smooth real scattering potential
+    v = np.sin(np.pi*x/l)**2
+
+    # amplitudes from the real and the complex representation
+    r_real, t_real = scatter1d.amplitudes(e, v, dx, left)
+    r_cplx, t_cplx = scatter1d.amplitudes(e, v.astype(complex), dx, left)
+
+    # compare both code paths
+    assert np.allclose(r_real, r_cplx)
+    assert np.allclose(t_real, t_cplx)
+
+
+
+@pytest.mark.parametrize('l', [10, ])
+@pytest.mark.parametrize('n', [230, ])
+@pytest.mark.parametrize('left', [False, True])
+
+def test_amplitudes_batch(l, n, left):
+    '''checks batched amplitudes against per-problem results.'''
+
+    # particle energy and potential height per problem
+    e = np.array([0.3, 0.8, 1.5])
+    v0 = np.array([1.0, 0.5, 2.0])
+
+    # sampling points
+    x, dx = sampling_points(l, n)
+
+    # one smooth scattering potential per row
+    v = v0[:, np.newaxis] * np.sin(np.pi*x/l)**2
+
+    # amplitudes for all problems at once
+    r_batch, t_batch = scatter1d.amplitudes_batch(e, v, dx, left)
+
+    # compare with amplitudes calculated one problem at a time
+    for i in range(e.size):
+        r_single, t_single = scatter1d.amplitudes(e[i], v[i], dx, left)
+        assert np.allclose(r_batch[i], r_single)
+        assert np.allclose(t_batch[i], t_single)
+
+
+
+@pytest.mark.parametrize('v0', [1.0, 1.0-0.5j])
+@pytest.mark.parametrize('l', [10, ])
+@pytest.mark.parametrize('n', [230, ])
+@pytest.mark.parametrize('left', [False, True])
+
+def test_wavefunctions_reduce(v0, l, n, left):
+    '''checks fused reductions against the stored wave functions.'''
+
+    # particle energies
+    e = np.array([0.3, 0.8, 1.5])
+
+    # sampling points
+    x, dx = sampling_points(l, n)
+
+    # smooth scattering potential
+    v = v0 * np.sin(np.pi*x/l)**2
+
+    # wave functions stored and reduced afterwards
+    y = scatter1d.wavefunctions(e, v, dx, left)
+
+    # fused reductions accumulated inside the sweep
+    s_red = scatter1d.wavefunctions_reduce(e, v, dx, left, 'abs2_sum')
+    m_red = scatter1d.wavefunctions_reduce(e, v, dx, left, 'max_abs')
+
+    # compare with reductions of the stored wave functions
+    assert np.allclose(s_red, np.sum(np.abs(y)**2, axis=1))
+    assert np.allclose(m_red, np.max(np.abs(y), axis=1))
+
+    # unknown reductions are rejected
+    with pytest.raises(ValueError):
+        scatter1d.wavefunctions_reduce(e, v, dx, left, 'sum')
+
+
+
+@pytest.mark.parametrize('v0', [1.0, 1.0-0.5j])
+@pytest.mark.parametrize('l', [10, ])
+@pytest.mark.parametrize('n', [230, ])
+@pytest.mark.parametrize('left', [False, True])
+
+def test_amplitudes_flat_runs(v0, l, n, left, monkeypatch):
+    '''checks analytic flat-run propagation against the plain sweep.'''
+
+    # particle energies
+    e = np.array([0.3, 0.8, 1.5])
+
+    # sampling points
+    x, dx = sampling_points(l, n)
+
+    # piecewise constant potential with several flat runs
+    v = np.zeros(n, dtype=np.asarray(v0).dtype)
+    v[60:140] = v0
+    v[170:220] = 0.5*v0
+
+    # amplitudes with flat runs propagated analytically
+    r_runs, t_runs = scatter1d.amplitudes(e, v, dx, left)
+
+    # raising the run threshold forces the plain numerov sweep
+    monkeypatch.setattr(scatter1d, '_RUN_MIN', n + 1)
+    r_sweep, t_sweep = scatter1d.amplitudes(e, v, dx, left)
+
+    # compare both code paths
+    assert np.allclose(r_runs, r_sweep)
+    assert np.allclose(t_runs, t_sweep)
+
+
+
+@pytest.mark.parametrize('v0', [1.0, 1.0-0.5j])
+@pytest.mark.parametrize('l', [1.0, ])
+@pytest.mark.parametrize('n', [10000, ])
+@pytest.mark.parametrize('left', [False, True])
+
+def test_amplitudes_uniform_fast_path(v0, l, n, left):
+    '''checks closed-form constant-potential path against numerov sweep.'''
+
+    # particle energies
+    e = np.array([0.4, 0.9, 1.6])
+
+    # sampling points
+    x, dx = sampling_points(l, n)
+
+    # constant potential takes the closed-form fast path
+    v = np.full(n, v0)
+    r_fast, t_fast = scatter1d.amplitudes(e, v, dx, left)
+
+    # tiny perturbation forces the generic numerov sweep
+    v_pert = v.copy()
+    v_pert[0] += 1e-12
+    r_num, t_num = scatter1d.amplitudes(e, v_pert, dx, left)
+
+    # compare both code paths
+    assert np.allclose(r_fast, r_num, atol=1e-4)
+    assert np.allclose(t_fast, t_num, atol=1e-4)
+
+
+
+@pytest.mark.parametrize('left', [False, True])
+
+def test_single_point_potential(left):
+    '''checks degenerate potentials with a single sampling point.'''
+
+    # particle energy, step size and single-point potential
+    e = 0.8
+    dx = 0.05
+    v = np.array([0.3])
+
+    # a single perturbed point barely disturbs the free propagation
+    r, t = scatter1d.amplitudes(e, v, dx, left)
+    assert np.isclose(r, 0, atol=0.05)
+    assert np.isclose(t, 1, atol=0.05)
+
+    # wave function consists of the single sampling point
+    y = scatter1d.wavefunction(e, v, dx, left)
+    assert y.shape == (1, )
+
+    # fused reductions match the explicit wave function
+    s_red = scatter1d.wavefunctions_reduce(e, v, dx, left, 'abs2_sum')
+    m_red = scatter1d.wavefunctions_reduce(e, v, dx, left, 'max_abs')
+
+    assert np.allclose(s_red, np.sum(np.abs(y)**2))
+    assert np.allclose(m_red, np.max(np.abs(y)))
+
+
+
+@functools.lru_cache(maxsize=None)
+def rectangular_barrier(e, v0, l, n, left):
+    '''exact wave function and amplitudes for rectangular potential.
+
+    memoized since the amplitude and wave function tests share the
+    same parameter combinations.
+    '''
+
+    # sampling points
+    x = sampling_points(l, n)[0]
+
     
     if np.isclose(e, v0):
         # limiting case
@@ -173,7 +440,15 @@ def rectangular_barrier(e, v0, l, x, left):
             beta1 = 2*k0*(k0+k1) * np.exp(-1J*k0*l) / denominator
         
         
-        # wave function inside scattering region
-        y = beta0 * np.exp(1J*k1*x) + beta1 * np.exp(-1J*k1*x)
+        # wave function inside scattering region.
+        # phase factors exp(1J*k1*x) built by cumulative products over
+        # the constant step factor: one scalar exponential replaces a
+        # vector exponential, and exp(-1J*k1*x) = 1/phase
+        phase = np.empty(len(x), dtype=complex)
+        phase[0] = np.exp(1J*k1*x[0])
+        phase[1:] = np.exp(1J*k1*(x[1]-x[0]))
+        np.multiply.accumulate(phase, out=phase)
+
+        y = beta0 * phase + beta1 / phase
     
     return r, t, y
@@ -36,3 +36,157 @@ def test_numerov(a, b, q, fex):
     # compare numerical and exact solutions (full and partial)
     assert np.allclose(y_ex_full, y_num_full)
     assert np.allclose(y_ex_part, y_num_part)
+
+
+
+def test_numerov_vectorized():
+    '''checks vectorized solution of independent problems (columns of q).'''
+
+    # sampling points
+    x, dx = np.linspace(0, 1, 101, retstep=True)
+
+    # constant q per problem with exact solutions y = sin(sqrt(c) x)
+    c = np.array([1.0, 4.0, 9.0])
+    q = np.broadcast_to(c, (x.size, c.size))
+
+    # initial values per problem
+    y0 = np.sin(np.sqrt(c) * x[0])
+    y1 = np.sin(np.sqrt(c) * x[1])
+
+    # numerical solutions (full and partial)
+    y_num_full = sol.numerov(q, y0, y1, dx, full=True)
+    y_num_part = sol.numerov(q, y0, y1, dx, full=False)
+
+    # exact analytical solution with dimensions (position, problem)
+    y_ex = np.sin(np.sqrt(c) * x[:, np.newaxis])
+
+    # compare numerical and exact solutions (full and partial)
+    assert np.allclose(y_num_full, y_ex)
+    assert np.allclose(y_num_part[0], y_ex[-2])
+    assert np.allclose(y_num_part[1], y_ex[-1])
+
+
+
+@pytest.mark.parametrize('full', [False, True])
+
+def test_numerov_dtypes(full):
+    '''checks result dtypes for real and complex inputs.'''
+
+    # sampling points
+    x, dx = np.linspace(0, 1, 101, retstep=True)
+
+    # real and complex problems with matching initial values
+    q = np.ones(x.size)
+    y0, y1 = np.sin(x[0]), np.sin(x[1])
+
+    def iscomplex(y):
+        # full solution or tuple of last two values
+        return np.iscomplexobj(np.asarray(y))
+
+    # real inputs yield real solutions
+    assert not iscomplex(sol.numerov(q, y0, y1, dx, full))
+
+    # complex initial values or coefficients yield complex solutions
+    assert iscomplex(sol.numerov(q, complex(y0), complex(y1), dx, full))
+    assert iscomplex(sol.numerov(q.astype(complex), y0, y1, dx, full))
+
+
+
+def test_numerov_short_q():
+    '''checks that too short q passes the initial values through.'''
+
+    # single sampling point leaves no room for an iteration
+    y0, y1 = sol.numerov(np.ones(1), 0.3, 0.4, 0.1, full=False)
+    assert np.isclose(y0, 0.3)
+    assert np.isclose(y1, 0.4)
+
+    # batch of problems broadcasts the initial values unchanged
+    y0, y1 = sol.numerov(np.ones((1, 3)), 0.3, 0.4, 0.1, full=False)
+    assert np.allclose(y0, 0.3)
+    assert np.allclose(y1, 0.4)
+
+
+
+def test_numerov_out_buffer():
+    '''checks that a caller-provided buffer is filled and returned.'''
+
+    # sampling points
+    x, dx = np.linspace(0, 1, 101, retstep=True)
+
+    # problem with exact solution y = sin(x)
+    q = np.ones(x.size)
+    y0, y1 = np.sin(x[0]), np.sin(x[1])
+
+    # reusable buffer for the full solution
+    out = np.empty(x.size)
+    y = sol.numerov(q, y0, y1, dx, full=True, out=out)
+
+    # solver writes into and returns the given buffer
+    assert y is out
+    assert np.allclose(y, np.sin(x))
+
+    # buffers of wrong shape are rejected
+    with pytest.raises(ValueError):
+        sol.numerov(q, y0, y1, dx, full=True, out=np.empty(x.size - 1))
+
+    # real buffers cannot hold complex solutions
+    with pytest.raises(ValueError):
+        sol.numerov(q, complex(y0), complex(y1), dx, full=True,
+            out=np.empty(x.size))
+
+
+
+def test_numerov_constant_lfilter():
+    '''checks the recurrence against its IIR filter formulation.
+
+    at constant q the Numerov recurrence is a linear time-invariant
+    filter y[i] = (b/a)*y[i-1] - y[i-2], so scipy.signal.lfilter with
+    zero input and matching initial conditions reproduces the sweep.
+    '''
+
+    # filter implementation requires the optional scipy dependency
+    pytest.importorskip('scipy')
+
+    from scipy.signal import lfilter, lfiltic
+
+    # sampling points
+    x, dx = np.linspace(0, 1, 101, retstep=True)
+
+    # constant q with exact solution y = sin(sqrt(2) x)
+    q = np.full(x.size, 2.0)
+    y0, y1 = np.sin(np.sqrt(2)*x[0]), np.sin(np.sqrt(2)*x[1])
+
+    # solution from the numerov sweep
+    y_num = sol.numerov(q, y0, y1, dx, full=True)
+
+    # coefficient ratio of the constant recurrence
+    rho = (24 - 10*dx*dx*2.0) / (12 + dx*dx*2.0)
+
+    # filter with zero input seeded with the initial values
+    zi = lfiltic([0.0], [1.0, -rho, 1.0], [y1, y0])
+    y_lti, _ = lfilter([0.0], [1.0, -rho, 1.0], np.zeros(x.size - 2), zi=zi)
+
+    # compare sweep and filter formulation
+    assert np.allclose(y_num[2:], y_lti)
+
+
+
+def test_numerov_matrix():
+    '''checks banded-matrix formulation against the recurrence.'''
+
+    # banded solve requires the optional scipy dependency
+    pytest.importorskip('scipy')
+
+    # sampling points
+    x, dx = np.linspace(0, 1, 101, retstep=True)
+
+    # smoothly varying q with complex initial values
+    q = 1 + 0.5*np.sin(2*np.pi*x)
+    y0, y1 = np.exp(0.2J), np.exp(0.3J)
+
+    # solutions from recurrence and banded solve
+    y_rec = sol.numerov(q, y0, y1, dx, full=True)
+    y_mat = sol.numerov_matrix(q, y0, y1, dx)
+
+    # compare both formulations
+    assert np.allclose(y_rec, y_mat)
@@ -4,8 +4,13 @@
 # import relevant modules
 from . import solvers
 from . import scatter1d
+from . import utils
 
 
 # make selected functions available in package namespace
 from .scatter1d import amplitudes
+from .scatter1d import amplitudes_batch
 from .scatter1d import wavefunction
+from .scatter1d import wavefunctions
+from .scatter1d import wavefunctions_reduce
+from .utils import abs2
@@ -36,7 +36,8 @@ transmission amplitude t = c/a
 
 
 import numpy as np
-from transport.solvers import numerov
+from transport.solvers import numerov, numerov_reduce
+from transport.utils import abs2
 
 
 def amplitudes(e, v, dx, left):
@@ -59,64 +60,166 @@ def amplitudes(e, v, dx, left):
     
     # number of sampling points
     n = len(v)
-    
-    # additional sampling points in each lead region used to set up initial 
-    # values and to match solution with free propagation ansatz
-    v = np.concatenate(((0, 0), v, (0, 0)))
-    
+
+    # convert array-like to array
+    v = np.asarray(v)
+
+    if n > 1 and np.all(v == v[0]):
+        # constant potential: the scattering problem has a closed-form
+        # solution, which replaces the O(n) sweep by O(1) work per energy
+        return _amplitudes_uniform(e, v[0], (n-1)*dx, left)
+
+    # set up Schroedinger equation y''(x) + q(x)*y(x) = 0 with q(x) = e - v(x).
+    # speeds up calculation if energy e is array-like, as numerov solves
+    # scattering problems at different energies in a vectorized way
+    # meaning of dimensions: (position, energy).
+    # q keeps the dtype of the potential: real potentials yield real
+    # coefficients, for which the solver runs a cheaper real-arithmetic
+    # kernel on the complex wave function
+    q = e - v[:, np.newaxis]
+
+    # maximal constant runs of the potential in sweep order, which are
+    # propagated analytically instead of swept step by step
+    runs = _flat_runs(v[::-1] if left else v)
+
+    return _amplitudes_sweep(e, q, dx, left, runs)
+
+
+
+def amplitudes_batch(e, v, dx, left):
+    '''returns amplitudes r and t for a batch of scattering problems.
+
+    solves one scattering problem per row of v in a single vectorized
+    sweep, amortizing the per-call overhead of amplitudes when scanning
+    e.g. over a potential parameter.
+
+    Parameters
+    ----------
+    e : array-like
+        dimensionless particle energy per problem
+        measured in hbar^2 / (2*m*s^2)
+    v : array-like
+        dimensionless potentials within scattering region with shape
+        (len(e), n). row v[i] holds the potential of problem i
+        discretized at n sampling points.
+    dx : scalar
+        step size to discretize potential and wave function.
+        measured in arbitrary length s
+    left : bool
+        solves scattering problems for left (right) incident particles
+        if argument is true (false).
+    '''
+
+    # convert array-like to arrays
+    e = np.asarray(e)
+    v = np.asarray(v)
+
+    # set up Schroedinger equation y''(x) + q(x)*y(x) = 0 per problem.
+    # transpose to solver layout with dimensions (position, problem),
+    # made contiguous once here instead of inside the solver
+    q = np.ascontiguousarray((e[:, np.newaxis] - v).T)
+
+    return _amplitudes_sweep(e, q, dx, left)
+
+
+
+def _amplitudes_sweep(e, q, dx, left, runs=()):
+    '''amplitudes from the numerov sweep over q.
+
+    the columns of q hold independent problems. shared backend of
+    amplitudes and amplitudes_batch. constant runs of the potential
+    (see _flat_runs) are advanced analytically instead of swept.
+    '''
+
+    # number of sampling points
+    n = len(q)
+
     # wave vector in lead regions
     # scalar or array-like as given by energy e
     k = np.sqrt(e)
-    
-    
-    # set up Schroedinger equation y''(x) + q(x)*y(x) = 0 with q(x) = e - v(x). 
-    # speeds up calculation if energy e is array-like, as numerov solves 
-    # scattering problems at different energies in a vectorized way
-    # meaning of dimensions: (position, energy)
-    q = e - v[:, np.newaxis]
-    
-    
-    if left:
-        # case: particle is incident from left lead
-        # propagate initial values backwards (from right to left lead)
-        q = q[::-1]
-    
-    # else:
-        # case: particle is incident from right lead
-        # propagate initial values forwards (from left to right lead)
-        # use vector q unmodified
-    
-    
-    
+
+
+    # case: particle is incident from left lead
+    # propagate initial values backwards (from right to left lead).
+    # the solver sweeps q in reverse without copying the array
+
+    # case: particle is incident from right lead
+    # propagate initial values forwards (from left to right lead)
+
+
     # initial values made independent of particle moving direction
-    
+
     # case: particle incident from left lead
     # initial values in right lead with c = exp(-ik n*dx)
-    
+
     # case: particle incident from right lead
     # initial values in left lead with c = exp(-ik dx)
-    
-    y0 = np.exp(1J*k*dx)
+
+    # phase factor accumulated over a single step and its inverse.
+    # computed once and shared by initial values and matching conditions
+    w = np.exp(1J*k*dx)
+    winv = 1.0 / w
+
+    y0 = w
     y1 = 1.0
-    
-    
-    # integrate Schroedinger equation forward (backward) in space. 
-    # calculate last two values of wave function in right (left) lead
-    y0, y1 = numerov(q, y0, y1, dx, full=False)
-    
-    
-    # match numerical solution with free propagation ansatz
-    det = np.exp(1J*k*dx) - np.exp(-1J*k*dx)
+
+
+    if n < 2:
+        # degenerate grid with fewer than two sampling points: the
+        # inlined lead steps below read two distinct potential rows,
+        # so pad the potential with explicit lead points instead and
+        # sweep the padded region as a whole
+        y0, y1 = numerov(_pad_leads(e, q), y0, y1, dx,
+            full=False, reverse=left)
+
+    else:
+        # rows of q at the first and last two points in sweep order
+        if left:
+            q0, q1, qn1, qn2 = q[-1], q[-2], q[0], q[1]
+        else:
+            q0, q1, qn1, qn2 = q[0], q[1], q[-1], q[-2]
+
+        # lead coefficients of the Numerov iteration, where q(x) = e
+        h2 = dx*dx
+        al = 12 + h2*np.asarray(e)
+        bl = 24 - 10*h2*np.asarray(e)
+
+        # advance initial values by two steps into the scattering
+        # region by hand. this way q is used without padding it with
+        # lead points, which avoids copying the potential in every call
+        y0, y1 = y1, (bl*y1 - al*y0) / (12 + h2*q0)
+        y0, y1 = y1, ((24 - 10*h2*q0)*y1 - al*y0) / (12 + h2*q1)
+
+        # integrate Schroedinger equation forward (backward) in space
+        # across the scattering region, skipping over flat runs
+        if runs:
+            y0, y1 = _propagate_runs(q, y0, y1, dx, left, runs)
+        else:
+            y0, y1 = numerov(q, y0, y1, dx, full=False, reverse=left)
+
+        # advance solution by two steps into the far lead by hand.
+        # calculate last two values of wave function in right (left) lead
+        y0, y1 = y1, ((24 - 10*h2*qn1)*y1 - (12 + h2*qn2)*y0) / al
+        y0, y1 = y1, (bl*y1 - (12 + h2*qn1)*y0) / al
+
+
+    # match numerical solution with free propagation ansatz.
+    # all lead phases are integer powers of the one-step factor w,
+    # so no further exponentials are evaluated
+    det = w - winv
     
     if left:
-        a = (np.exp(2J*k*dx) * y0 - np.exp(1J*k*dx) * y1) / det
-        b = (-np.exp(-2J*k*dx) * y0 + np.exp(-1J*k*dx) * y1) / det
-        c = np.exp(-1J*k*n*dx)
+        a = (w*w * y0 - w * y1) / det
+        b = (-winv*winv * y0 + winv * y1) / det
+        c = winv**n
         
     else:
-        a = (np.exp(1J*k*(n+1)*dx) * y0 - np.exp(1J*k*n*dx) * y1) / det
-        b = (-np.exp(-1J*k*(n+1)*dx) * y0 + np.exp(-1J*k*n*dx) * y1) / det
-        c = np.exp(-1J*k*dx)
+        wn = w**n
+        winvn = winv**n
+        
+        a = (wn*w * y0 - wn * y1) / det
+        b = (-winvn*winv * y0 + winvn * y1) / det
+        c = winv
     
     
     # return reflection and transmission amplitudes
@@ -124,87 +227,441 @@ def amplitudes(e, v, dx, left):
 
 
 
+def wavefunctions_reduce(e, v, dx, left, reduce):
+    '''returns reduced wave function quantities (normalization a = 1).
+
+    accumulates the reduction inside the solver sweep instead of
+    storing the wave functions, which saves the memory traffic of
+    writing and re-reading them on long grids.
+
+    Parameters
+    ----------
+    e : scalar or array-like
+        dimensionless particle energies measured in hbar^2 / (2*m*s^2)
+    v : array-like
+        dimensionless potential within scattering region
+        measured in hbar^2 / (2*m*s^2)
+    dx : scalar
+        step size to discretize potential and wave function.
+        measured in arbitrary length s
+    left : bool
+        solves scattering problem for left (right) incident particle
+        if argument is true (false).
+    reduce : str
+        'abs2_sum' returns the sum of |y(x)|^2 and 'max_abs' the
+        maximum of |y(x)| over the sampling points per energy.
+    '''
+
+    if reduce not in ('abs2_sum', 'max_abs'):
+        raise ValueError('reduce must be "abs2_sum" or "max_abs"')
+
+    # number of sampling points
+    n = len(v)
+
+    # convert array-like to array
+    v = np.asarray(v)
+
+    if n < 2:
+        # degenerate grid with fewer than two sampling points: reduce
+        # the explicitly calculated wave functions instead
+        y = abs2(wavefunctions(np.atleast_1d(e), v, dx, left))
+
+        if reduce == 'abs2_sum':
+            return np.sum(y, axis=1)
+
+        return np.sqrt(np.max(y, axis=1))
+
+    # wave vector in lead regions
+    k = np.sqrt(np.asarray(e))
+
+    # set up Schroedinger equation with dimensions (position, energy),
+    # see wavefunctions
+    q = e - v[:, np.newaxis]
+
+    # rows of q at the first and last two points in sweep order
+    if left:
+        q0, q1, qn1, qn2 = q[-1], q[-2], q[0], q[1]
+    else:
+        q0, q1, qn1, qn2 = q[0], q[1], q[-1], q[-2]
+
+    # phase factor accumulated over a single step and its inverse
+    w = np.exp(1J*k*dx)
+    winv = 1.0 / w
+
+    y0 = w
+    y1 = 1.0
+
+    # lead coefficients of the Numerov iteration, where q(x) = e
+    h2 = dx*dx
+    al = 12 + h2*np.asarray(e)
+    bl = 24 - 10*h2*np.asarray(e)
+
+    # advance initial values by two steps into the scattering region
+    y0, y1 = y1, (bl*y1 - al*y0) / (12 + h2*q0)
+    y0, y1 = y1, ((24 - 10*h2*q0)*y1 - al*y0) / (12 + h2*q1)
+
+    # sweep the scattering region with the reduction of the
+    # unnormalized wave function accumulated in the same pass
+    mode = 'abs2_sum' if reduce == 'abs2_sum' else 'abs2_max'
+    y0, y1, red = numerov_reduce(q, y0, y1, dx, mode, reverse=left)
+
+    # advance solution by two steps into the far lead
+    y0, y1 = y1, ((24 - 10*h2*qn1)*y1 - (12 + h2*qn2)*y0) / al
+    y0, y1 = y1, (bl*y1 - (12 + h2*qn1)*y0) / al
+
+    # normalization from matching with free propagation ansatz
+    det = w - winv
+
+    if left:
+        a = (w*w * y0 - w * y1) / det
+    else:
+        wn = w**n
+        a = (wn*w * y0 - wn * y1) / det
+
+    # the normalization scales every wave function value by the common
+    # factor 1/a, so the reduction is rescaled after the sweep
+    if reduce == 'abs2_sum':
+        return red / abs2(a)
+
+    return np.sqrt(red) / np.abs(a)
+
+
+
+def _pad_leads(e, q):
+    '''returns q padded with two explicit lead rows on each side.
+
+    fallback for degenerate grids with fewer than two sampling points,
+    where the lead steps cannot be inlined around the sweep.
+    '''
+
+    # lead rows with q(x) = e
+    lead = np.empty((2, ) + q.shape[1:], q.dtype)
+    lead[:] = e
+
+    return np.concatenate((lead, q, lead))
+
+
+
+# minimal number of points of a constant potential run worth
+# propagating analytically instead of sweeping step by step
+_RUN_MIN = 32
+
+
+def _flat_runs(v):
+    '''maximal constant runs of the potential with at least _RUN_MIN points.
+
+    returns index pairs (s, t) marking runs v[s] == ... == v[t].
+    '''
+
+    # boundaries where the potential changes value
+    edges = np.flatnonzero(np.diff(v) != 0)
+
+    starts = np.concatenate(((0, ), edges + 1))
+    ends = np.concatenate((edges, (len(v) - 1, )))
+
+    return [(s, t) for s, t in zip(starts, ends) if t - s + 1 >= _RUN_MIN]
+
+
+
+def _propagate_runs(q, y0, y1, dx, left, runs):
+    '''state after the sweep over q with analytic flat-run skips.
+
+    runs hold index pairs in sweep order (see _flat_runs); left picks
+    the sweep direction through q.
+    '''
+
+    n = len(q)
+
+    # sweep-order view of q. the negative stride for left incidence is
+    # only realized on the short stretches between runs
+    qs = q[::-1] if left else q
+
+    # wave function known at sweep positions (pos, pos+1)
+    pos = 0
+
+    for s, t in runs:
+        if pos < s:
+            # ordinary sweep up to the first two points of the run
+            y0, y1 = numerov(qs[pos:s+2], y0, y1, dx, full=False)
+
+        # analytic advance across the run interior
+        y0, y1 = _propagate_flat(qs[s], y0, y1, dx, t - s - 1)
+        pos = t - 1
+
+    if pos < n - 2:
+        # ordinary sweep over the remaining stretch
+        y0, y1 = numerov(qs[pos:], y0, y1, dx, full=False)
+
+    return y0, y1
+
+
+
+def _propagate_flat(qc, y0, y1, dx, m):
+    '''advances the state by m steps at constant q.
+
+    on a flat run the Numerov recurrence has constant coefficients and
+    its solution combines powers of the two roots of the characteristic
+    polynomial lam^2 - (b/a)*lam + 1 = 0. the whole run therefore
+    advances in O(1) instead of O(m) steps.
+    '''
+
+    h2 = dx*dx
+
+    # ratio b/a of the recurrence coefficients
+    rho = (24 - 10*h2*qc) / (12 + h2*qc)
+
+    # degenerate roots require the limiting solution. the tight
+    # tolerance keeps nearly degenerate (but well conditioned) cases in
+    # the general branch; their discriminant is replaced by a dummy
+    # value to keep that branch regular
+    limit = np.isclose(rho*rho, 4, rtol=0, atol=1e-12)
+    disc = np.sqrt(np.where(limit, 1, rho*rho - 4).astype(complex))
+
+    # roots of the characteristic polynomial (their product is one).
+    # dummy roots of one avoid spurious overflow in the powers below
+    lamp = np.where(limit, 1, (rho + disc) / 2)
+    lamm = np.where(limit, 1, (rho - disc) / 2)
+
+    # coefficients matching the state (y0, y1)
+    alpha = (y1 - lamm*y0) / disc
+    beta = (lamp*y0 - y1) / disc
+
+    # advance both state values by m steps
+    u0 = alpha * lamp**m + beta * lamm**m
+    u1 = alpha * lamp**(m+1) + beta * lamm**(m+1)
+
+
+    if np.any(limit):
+        # limiting case of degenerate roots lam = rho/2 with solution
+        # y_i = (alpha + beta*i) * lam^i
+        lam = rho / 2
+        beta = y1/lam - y0
+
+        u0 = np.where(limit, (y0 + beta*m) * lam**m, u0)
+        u1 = np.where(limit, (y0 + beta*(m+1)) * lam**(m+1), u1)
+
+
+    return u0, u1
+
+
+
+def _amplitudes_uniform(e, v0, l, left):
+    '''closed-form amplitudes for a constant potential of length l.
+
+    exact solution of the rectangular barrier problem, equivalent to
+    the converged numerov sweep but with O(1) work per energy.
+    '''
+
+    # treat energies as vector to ease the matching expressions
+    e = np.atleast_1d(np.asarray(e))
+
+    # wave vector in lead regions
+    k0 = np.sqrt(e)
+
+    # energies at the top of the barrier require the limiting solution.
+    # replace them by a dummy value to keep the general branch regular
+    limit = np.isclose(e, v0)
+    k1 = np.sqrt(np.where(limit, 1, e - v0).astype(complex))
+
+
+    # general case
+    det = (k0+k1)**2 * np.exp(-1J*k1*l) - (k0-k1)**2 * np.exp(1J*k1*l)
+
+    t = 4*k0*k1 * np.exp(-1J*k0*l) / det
+    r = (k1*k1 - k0*k0) * np.exp(-2J*k0*l) * \
+        (np.exp(1J*k1*l) - np.exp(-1J*k1*l)) / det
+
+    if left:
+        # correct reflection amplitude for left incidence
+        r = r * np.exp(2J*k0*l)
+
+
+    if np.any(limit):
+        # limiting case e = v0
+        kl = np.sqrt(complex(v0))
+        det = 2J + kl*l
+
+        tl = 2J * np.exp(-1J*kl*l) / det
+        rl = kl*l * np.exp(-2J*kl*l) / det
+
+        if left:
+            rl = rl * np.exp(2J*kl*l)
+
+        r = np.where(limit, rl, r)
+        t = np.where(limit, tl, t)
+
+
+    return r, t
+
+
+
 def wavefunction(e, v, dx, left):
     '''returns wave function within scattering region (normalization a = 1).
-    
+
     Parameters
     ----------
     e : scalar
         dimensionless particle energy measured in hbar^2 / (2*m*s^2)
     v : array-like
-        dimensionless potential within scattering region 
+        dimensionless potential within scattering region
         measured in hbar^2 / (2*m*s^2)
     dx : scalar
-        step size to discretize potential and wave function. 
+        step size to discretize potential and wave function.
         measured in arbitrary length s
     left : bool
-        solves scattering problem for left (right) incident particle 
+        solves scattering problem for left (right) incident particle
         if argument is true (false).
     '''
-    
-    
+
+    # delegate to vectorized routine and extract single wave function
+    return wavefunctions((e, ), v, dx, left)[0]
+
+
+
+def wavefunctions(e, v, dx, left, part=None):
+    '''returns wave functions within scattering region (normalization a = 1).
+
+    Parameters
+    ----------
+    e : array-like
+        dimensionless particle energies measured in hbar^2 / (2*m*s^2)
+    v : array-like
+        dimensionless potential within scattering region
+        measured in hbar^2 / (2*m*s^2)
+    dx : scalar
+        step size to discretize potential and wave function.
+        measured in arbitrary length s
+    left : bool
+        solves scattering problem for left (right) incident particle
+        if argument is true (false).
+    part : None or str, optional
+        return complex wave functions (default), only their real part
+        ('real') or their squared magnitude ('abs2'). the reduced
+        variants store float instead of complex values and process one
+        energy at a time, halving the memory footprint.
+
+    Returns
+    -------
+    y : ndarray
+        wave functions with shape (len(e), len(v)). row y[i] holds the
+        wave function for particle energy e[i] at the sampling points.
+    '''
+
+
     # number of sampling points
     n = len(v)
-    
+
+
+    if part is not None:
+        # reduce wave functions to float values. solving one energy at
+        # a time keeps only a single complex row in memory
+        if part not in ('real', 'abs2'):
+            raise ValueError('part must be None, "real" or "abs2"')
+
+        func = np.real if part == 'real' else abs2
+
+        e = np.atleast_1d(np.asarray(e))
+        y = np.empty((e.size, n))
+
+        for i in range(e.size):
+            y[i] = func(wavefunctions(e[i], v, dx, left)[0])
+
+        return y
+
     # convert array-like to array
     v = np.asarray(v)
-    
+
     # wave vector in lead regions
-    k = np.sqrt(e)
-    
-    
-    # set up Schroedinger equation y''(x) + q(x)*y(x) = 0 with q(x) = e - v(x). 
-    # additional sampling points in each lead region used to set up initial 
-    # values and to match solution with free propagation ansatz
-    q = np.concatenate(((e, e), e-v, (e, e)))
-    
-    
-    if left:
-        # case: particle is incident from left lead
-        # propagate initial values backwards (from right to left lead)
-        q = q[::-1]
-    
-    # else:
-        # case: particle is incident from right lead
-        # propagate initial values forwards (from left to right lead)
-        # use vector q unmodified
-    
+    k = np.sqrt(np.asarray(e))
+
+
+    # set up Schroedinger equation y''(x) + q(x)*y(x) = 0 with q(x) = e - v(x).
+    # speeds up calculation as numerov solves scattering problems at
+    # different energies in a vectorized way
+    # meaning of dimensions: (position, energy)
+    q = e - v[:, np.newaxis]
     
     
+    # case: particle is incident from left lead
+    # propagate initial values backwards (from right to left lead).
+    # the solver sweeps q in reverse without copying the array
+
+    # case: particle is incident from right lead
+    # propagate initial values forwards (from left to right lead)
+
+
     # initial values made independent of particle moving direction
-    
+
     # case: particle incident from left lead
     # initial values in right lead with c = exp(-ik n*dx)
-    
+
     # case: particle incident from right lead
     # initial values in left lead with c = exp(-ik dx)
-    
-    y0 = np.exp(1J*k*dx)
+
+    # phase factor accumulated over a single step and its inverse.
+    # computed once and shared by initial values and matching conditions
+    w = np.exp(1J*k*dx)
+    winv = 1.0 / w
+
+    y0 = w
     y1 = 1.0
-    
-    
-    # calculate full wave function in scattering region 
-    # including two values on each side in the leads.
-    y = numerov(q, y0, y1, dx, full=True)
-    
-    # extract last two values of wave function in right (left) lead
-    y0, y1 = y[-2], y[-1]
-    
-    
+
+
+    if n < 2:
+        # degenerate grid with fewer than two sampling points: solve
+        # the potential padded with explicit lead points as a whole
+        # (see _amplitudes_sweep)
+        y = numerov(_pad_leads(e, q), y0, y1, dx, full=True, reverse=left)
+
+        # extract last two values in the far lead and remove the
+        # padded points
+        y0, y1 = y[-2], y[-1]
+        y = y[2:-2]
+
+    else:
+        # rows of q at the first and last two points in sweep order
+        if left:
+            q0, q1, qn1, qn2 = q[-1], q[-2], q[0], q[1]
+        else:
+            q0, q1, qn1, qn2 = q[0], q[1], q[-1], q[-2]
+
+        # lead coefficients of the Numerov iteration, where q(x) = e
+        h2 = dx*dx
+        al = 12 + h2*np.asarray(e)
+        bl = 24 - 10*h2*np.asarray(e)
+
+        # advance initial values by two steps into the scattering
+        # region by hand. this way q is used without padding it with
+        # lead points, which avoids copying the potential in every call
+        y0, y1 = y1, (bl*y1 - al*y0) / (12 + h2*q0)
+        y0, y1 = y1, ((24 - 10*h2*q0)*y1 - al*y0) / (12 + h2*q1)
+
+        # calculate full wave function in scattering region (in sweep order)
+        y = numerov(q, y0, y1, dx, full=True, reverse=left)
+
+        # advance solution by two steps into the far lead by hand.
+        # extract last two values of wave function in right (left) lead
+        y0, y1 = y[-2], y[-1]
+        y0, y1 = y1, ((24 - 10*h2*qn1)*y1 - (12 + h2*qn2)*y0) / al
+        y0, y1 = y1, (bl*y1 - (12 + h2*qn1)*y0) / al
+
+
     # reverse wave function if propagated backwards
     if left:
         y = y[::-1]
-    
-    
+
+
     # match numerical solution with free propagation ansatz
-    # to normalize wave function (normalization a = 1)
-    det = np.exp(1J*k*dx) - np.exp(-1J*k*dx)
+    # to normalize wave function (normalization a = 1).
+    # all lead phases are integer powers of the one-step factor w
+    det = w - winv
     
     if left:
-        a = (np.exp(2J*k*dx) * y0 - np.exp(1J*k*dx) * y1) / det
+        a = (w*w * y0 - w * y1) / det
     else:
-        a = (np.exp(1J*k*(n+1)*dx) * y0 - np.exp(1J*k*n*dx) * y1) / det
-    
-    # return wave function within scattering region
-    # remove concatenated points and normalize
-    return y[2:-2] / a
+        wn = w**n
+        a = (wn*w * y0 - wn * y1) / det
+
+    # return wave functions within scattering region
+    # normalize and reorder dimensions to (energy, position)
+    return (y / a).T
@@ -10,29 +10,406 @@ import numpy as np
 from builtins import range
 
 
-def numerov(q, y0, y1, dx, full):
+try:
+    # optional dependency to just-in-time compile the hot recurrences.
+    # all solvers fall back to pure numpy if numba is not installed
+    import numba
+    from numba import prange
+except ImportError:
+    numba = None
+    prange = range
+
+
+def _numerov_last(q, y0, y1, dx, step):
+    '''last two values of numerov recurrence (jit-compiled if possible).
+
+    the coefficients are folded into the loop body and rolled through
+    scalars, so each element of q is read exactly once and no
+    coefficient arrays are materialized. step = -1 sweeps q from its
+    last towards its first element (always with unit memory stride)
+    instead of reversing the array.
+    '''
+
+    # too short for a single iteration: the initial values pass
+    # through unchanged. guards the unchecked coefficient preloads
+    if len(q) < 2:
+        return y0, y1
+
+    h2 = dx*dx
+
+    # first index visited by the sweep
+    lo = 0 if step > 0 else len(q) - 1
+
+    # rolling scaled values h2*q at the two previously visited points
+    q0 = h2*q[lo]
+    q1 = h2*q[lo + step]
+
+    # iterate Numerov algorithm
+    for i in range(2, len(q)):
+        q2 = h2*q[lo + step*i]
+        inv = 1.0 / (12 + q2)
+        y0, y1 = y1, ((24 - 10*q1)*y1 - (12 + q0)*y0) * inv
+        q0 = q1
+        q1 = q2
+
+    return y0, y1
+
+
+# number of problems each thread advances jointly. chosen such that the
+# per-block state and the streamed coefficient rows fit into L1 cache
+# while leaving enough blocks to keep all threads busy
+_BLOCK = 128
+
+
+def _numerov_full(q, y, dx, step):
+    '''full solution of numerov recurrence (jit-compiled if possible).
+
+    the first two entries of y hold the initial values; the remaining
+    entries are filled in-place in sweep order. coefficients are
+    computed on the fly from rolled scalars and q is swept in the
+    direction given by step (see _numerov_last).
+    '''
+
+    # too short for a single iteration: only the initial values remain.
+    # guards the unchecked coefficient preloads
+    if len(q) < 2:
+        return y
+
+    h2 = dx*dx
+
+    # first index visited by the sweep
+    lo = 0 if step > 0 else len(q) - 1
+
+    # rolling scaled values h2*q at the two previously visited points
+    q0 = h2*q[lo]
+    q1 = h2*q[lo + step]
+
+    # iterate Numerov algorithm
+    for i in range(2, len(q)):
+        q2 = h2*q[lo + step*i]
+        inv = 1.0 / (12 + q2)
+        y[i] = ((24 - 10*q1)*y[i-1] - (12 + q0)*y[i-2]) * inv
+        q0 = q1
+        q1 = q2
+
+    return y
+
+
+def _numerov_full_batch(q, y, dx, step):
+    '''full solution of numerov recurrence for a batch of problems.
+
+    the columns of q hold independent problems (e.g. particle
+    energies). the first two rows of y hold the initial values; the
+    remaining rows are filled in-place in sweep order. blocks of
+    columns are distributed across threads as in _numerov_last_batch.
+    '''
+
+    h2 = dx*dx
+
+    n = q.shape[0]
+    m = q.shape[1]
+
+    # first row visited by the sweep
+    lo = 0 if step > 0 else n - 1
+
+    for jb in prange((m + _BLOCK - 1) // _BLOCK):
+
+        j0 = jb * _BLOCK
+        j1 = min(j0 + _BLOCK, m)
+
+        # iterate Numerov algorithm (see _numerov_last_batch). the
+        # coefficients come straight from the cached rows of q, so no
+        # coefficient arrays are materialized
+        for i in range(2, n):
+            for j in range(j0, j1):
+                y[i, j] = ((24 - 10*h2*q[lo + step*(i-1), j])*y[i-1, j]
+                    - (12 + h2*q[lo + step*(i-2), j])*y[i-2, j]) \
+                    * (1.0 / (12 + h2*q[lo + step*i, j]))
+
+    return y
+
+
+def _numerov_last_batch(q, y0, y1, dx, step):
+    '''last two values of numerov recurrence for a batch of problems.
+
+    the columns of q hold independent problems (e.g. particle energies),
+    which are distributed across threads in blocks. the initial values
+    y0 and y1 are overwritten in-place with the last two values. q is
+    swept in the direction given by step (see _numerov_last).
+    '''
+
+    h2 = dx*dx
+
+    n = q.shape[0]
+    m = q.shape[1]
+
+    # first row visited by the sweep
+    lo = 0 if step > 0 else n - 1
+
+    # blocks are independent and write to disjoint entries,
+    # hence no synchronization between threads is needed
+    for jb in prange((m + _BLOCK - 1) // _BLOCK):
+
+        j0 = jb * _BLOCK
+        j1 = min(j0 + _BLOCK, m)
+
+        # iterate Numerov algorithm with the position axis outside and
+        # the problem axis inside. the inner loop runs over contiguous
+        # row segments of q that stay cache resident across the three
+        # adjacent steps touching them; the coefficients are computed
+        # on the fly instead of being materialized as arrays
+        for i in range(2, n):
+            for j in range(j0, j1):
+                u1 = ((24 - 10*h2*q[lo + step*(i-1), j])*y1[j]
+                    - (12 + h2*q[lo + step*(i-2), j])*y0[j]) \
+                    * (1.0 / (12 + h2*q[lo + step*i, j]))
+                y0[j] = y1[j]
+                y1[j] = u1
+
+    return y0, y1
+
+
+def _numerov_last_batch_real(q, y0r, y0i, y1r, y1i, dx, step):
+    '''batched numerov recurrence for real q and complex state.
+
+    structure-of-arrays variant of _numerov_last_batch: since the
+    coefficients are real, the real and imaginary parts of the state
+    evolve independently. carrying them as separate float arrays turns
+    the inner loop into plain real multiply-adds, which the compiler
+    packs into SIMD lanes.
+    '''
+
+    h2 = dx*dx
+
+    n = q.shape[0]
+    m = q.shape[1]
+
+    # first row visited by the sweep
+    lo = 0 if step > 0 else n - 1
+
+    for jb in prange((m + _BLOCK - 1) // _BLOCK):
+
+        j0 = jb * _BLOCK
+        j1 = min(j0 + _BLOCK, m)
+
+        # iterate Numerov algorithm (see _numerov_last_batch). each
+        # coefficient is computed once and shared by the real and
+        # imaginary part of the state
+        for i in range(2, n):
+            for j in range(j0, j1):
+                b1 = 24 - 10*h2*q[lo + step*(i-1), j]
+                a0 = 12 + h2*q[lo + step*(i-2), j]
+                inv = 1.0 / (12 + h2*q[lo + step*i, j])
+
+                ur = (b1*y1r[j] - a0*y0r[j]) * inv
+                ui = (b1*y1i[j] - a0*y0i[j]) * inv
+
+                y0r[j] = y1r[j]
+                y0i[j] = y1i[j]
+                y1r[j] = ur
+                y1i[j] = ui
+
+    return y0r, y0i, y1r, y1i
+
+
+def _numerov_abs2_sum_batch(q, y0, y1, dx, step):
+    '''batched numerov recurrence with fused sum of squared magnitudes.
+
+    advances the state as _numerov_last_batch and accumulates
+    sum_i |y_i|^2 per problem column in the same pass, so the solution
+    never has to be stored.
+    '''
+
+    h2 = dx*dx
+
+    n = q.shape[0]
+    m = q.shape[1]
+
+    # first row visited by the sweep
+    lo = 0 if step > 0 else n - 1
+
+    red = np.zeros(m)
+
+    for jb in prange((m + _BLOCK - 1) // _BLOCK):
+
+        j0 = jb * _BLOCK
+        j1 = min(j0 + _BLOCK, m)
+
+        # contribution of the initial values
+        for j in range(j0, j1):
+            red[j] = (y0[j].real*y0[j].real + y0[j].imag*y0[j].imag
+                + y1[j].real*y1[j].real + y1[j].imag*y1[j].imag)
+
+        # iterate Numerov algorithm (see _numerov_last_batch) and fold
+        # each new value into the running sum
+        for i in range(2, n):
+            for j in range(j0, j1):
+                u1 = ((24 - 10*h2*q[lo + step*(i-1), j])*y1[j]
+                    - (12 + h2*q[lo + step*(i-2), j])*y0[j]) \
+                    * (1.0 / (12 + h2*q[lo + step*i, j]))
+                y0[j] = y1[j]
+                y1[j] = u1
+                red[j] += u1.real*u1.real + u1.imag*u1.imag
+
+    return red
+
+
+def _numerov_abs2_max_batch(q, y0, y1, dx, step):
+    '''batched numerov recurrence with fused maximal squared magnitude.
+
+    advances the state as _numerov_last_batch and tracks
+    max_i |y_i|^2 per problem column in the same pass.
+    '''
+
+    h2 = dx*dx
+
+    n = q.shape[0]
+    m = q.shape[1]
+
+    # first row visited by the sweep
+    lo = 0 if step > 0 else n - 1
+
+    red = np.zeros(m)
+
+    for jb in prange((m + _BLOCK - 1) // _BLOCK):
+
+        j0 = jb * _BLOCK
+        j1 = min(j0 + _BLOCK, m)
+
+        # contribution of the initial values
+        for j in range(j0, j1):
+            red[j] = max(
+                y0[j].real*y0[j].real + y0[j].imag*y0[j].imag,
+                y1[j].real*y1[j].real + y1[j].imag*y1[j].imag)
+
+        # iterate Numerov algorithm (see _numerov_last_batch) and fold
+        # each new value into the running maximum
+        for i in range(2, n):
+            for j in range(j0, j1):
+                u1 = ((24 - 10*h2*q[lo + step*(i-1), j])*y1[j]
+                    - (12 + h2*q[lo + step*(i-2), j])*y0[j]) \
+                    * (1.0 / (12 + h2*q[lo + step*i, j]))
+                y0[j] = y1[j]
+                y1[j] = u1
+                red[j] = max(red[j], u1.real*u1.real + u1.imag*u1.imag)
+
+    return red
+
+
+if numba is not None:
+    # compile recurrences to machine code. numba specializes each
+    # kernel per input-type signature, so every realistic combination
+    # (real or complex q with real or complex state) gets its own
+    # machine-code variant without duplicated source.
+    # nogil lets callers parallelize independent solves with threads
+    _numerov_last = numba.njit(
+        cache=True, fastmath=True, nogil=True)(_numerov_last)
+    _numerov_full = numba.njit(
+        cache=True, fastmath=True, nogil=True)(_numerov_full)
+    _numerov_full_batch = numba.njit(
+        cache=True, fastmath=True, parallel=True)(_numerov_full_batch)
+    _numerov_last_batch = numba.njit(
+        cache=True, fastmath=True, parallel=True)(_numerov_last_batch)
+    _numerov_last_batch_real = numba.njit(
+        cache=True, fastmath=True, parallel=True)(_numerov_last_batch_real)
+    _numerov_abs2_sum_batch = numba.njit(
+        cache=True, fastmath=True, parallel=True)(_numerov_abs2_sum_batch)
+    _numerov_abs2_max_batch = numba.njit(
+        cache=True, fastmath=True, parallel=True)(_numerov_abs2_max_batch)
+
+
+def numerov(q, y0, y1, dx, full, reverse=False, out=None):
     '''integrate ode of type y''(x) + q(x)*y(x) = 0.
     
     Parameters
     ----------
     q : array-like
         function q(x) discretized at sampling points
-        x_m = m * dx with m = 0 ... n-1.
-    y0, y1 : scalar
+        x_m = m * dx with m = 0 ... n-1. a 2d array solves one
+        independent problem per column (e.g. one particle energy per
+        column) in a single vectorized sweep.
+    y0, y1 : scalar or array-like
         initial values given by y0 = y(0) and y1 = y(dx).
+        arrays broadcast against the trailing axes of q.
     dx : scalar
         step size to discretize functions.
     full : bool
-        return full solution y_0, y_1, ..., y_(n-1) or 
+        return full solution y_0, y_1, ..., y_(n-1) or
         only the last two values y_(n-2), y_(n-1).
+    reverse : bool, optional
+        sweep q from its last towards its first point, equivalent to
+        numerov(q[::-1], ...). the kernels walk q with their index
+        running backwards, which avoids materializing the reversed
+        array. the solution is returned in sweep order.
+    out : ndarray, optional
+        buffer of shape and dtype of the full solution, overwritten
+        and returned if full is true. lets callers in tight loops
+        reuse one allocation across many solves.
     '''
     
     # number of sampling points
     n = len(q)
-    
+
     # convert array-like to array
     q = np.asarray(q)
-    
+
+    # sweep direction through q
+    step = -1 if reverse else 1
+
+
+    if not full and numba is not None and q.ndim == 1:
+        # dispatch to jit-compiled recurrence. the kernel requires a
+        # contiguous vector q and eliminates interpreter overhead
+        return _numerov_last(np.ascontiguousarray(q), y0, y1, dx, step)
+
+
+    if not full and numba is not None and q.ndim == 2:
+        # dispatch batch of independent problems (columns of q) to
+        # jit-compiled recurrence parallelized across threads
+
+        # materialize initial values as vectors of the common type
+        dtype = np.result_type(q.dtype, np.asarray(y0).dtype,
+            np.asarray(y1).dtype)
+
+        y0 = np.broadcast_to(np.asarray(y0, dtype), q.shape[1:])
+        y1 = np.broadcast_to(np.asarray(y1, dtype), q.shape[1:])
+
+        q = np.ascontiguousarray(q)
+
+        if not np.iscomplexobj(q) and np.iscomplexobj(y0):
+            # real potential: real and imaginary parts of the state
+            # decouple. dispatch to the structure-of-arrays kernel
+            # with plain float arithmetic
+            y0r = y0.real.copy()
+            y0i = y0.imag.copy()
+            y1r = y1.real.copy()
+            y1i = y1.imag.copy()
+
+            _numerov_last_batch_real(q, y0r, y0i, y1r, y1i, dx, step)
+
+            return y0r + 1J*y0i, y1r + 1J*y1i
+
+        return _numerov_last_batch(q, y0.copy(), y1.copy(), dx, step)
+
+
+    if full and numba is not None and q.ndim in (1, 2):
+        # dispatch to jit-compiled recurrence filling the solution
+        # in-place. batches of problems (2d q) run across threads
+        y = _full_buffer(q, y0, y1, out)
+
+        q = np.ascontiguousarray(q)
+
+        if q.ndim == 1:
+            return _numerov_full(q, y, dx, step)
+
+        return _numerov_full_batch(q, y, dx, step)
+
+
+    # reversing the sweep is free without numba: the coefficient
+    # arrays below simply read q through a negative-stride view
+    if reverse:
+        q = q[::-1]
+
     # coefficients appearing in Numerov iteration
     # a[i]*y[i] = b[i-1]*y[i-1] - a[i-2]*y[i-2]
     a = 12 + dx*dx * q
@@ -40,21 +417,231 @@ def numerov(q, y0, y1, dx, full):
     
     
     if full:
-        # calculate and return full solution.
-        # extract more general type
-        y = np.empty(n, dtype=type(y0+y1))
-        y[0:2] = (y0, y1)
-        
+        # calculate and return full solution
+        y = _full_buffer(q, y0, y1, out)
+
         # iterate Numerov algorithm
         for i in range(2, n):
             y[i] = (b[i-1]*y[i-1] - a[i-2]*y[i-2]) / a[i]
-        
+
         return y
     
     else:
         # calculate and return last two values.
-        # iterate Numerov algorithm
+        # buffers preallocated and rotated through the iteration, so
+        # no fresh temporaries are created per step (relevant for
+        # energy sweeps without numba)
+        dtype = np.result_type(q.dtype, np.asarray(y0).dtype,
+            np.asarray(y1).dtype)
+        shape = np.broadcast_shapes(q.shape[1:], np.shape(y0), np.shape(y1))
+
+        y0 = np.broadcast_to(np.asarray(y0, dtype), shape).copy()
+        y1 = np.broadcast_to(np.asarray(y1, dtype), shape).copy()
+        u = np.empty(shape, dtype)
+
+        # reciprocals computed once: multiplying is cheaper than
+        # dividing in every step
+        inv_a = 1.0 / a
+
+        # iterate Numerov algorithm. y0 is overwritten in-place since
+        # its value is discarded within the same step
         for i in range(2, n):
-            y0, y1 = y1, (b[i-1]*y1 - a[i-2]*y0) / a[i]
-        
+            np.multiply(b[i-1], y1, out=u)
+            np.multiply(a[i-2], y0, out=y0)
+            np.subtract(u, y0, out=u)
+            np.multiply(u, inv_a[i], out=u)
+
+            y0, y1, u = y1, u, y0
+
         return y0, y1
+
+
+
+def numerov_reduce(q, y0, y1, dx, reduce, reverse=False):
+    '''integrate ode y''(x) + q(x)*y(x) = 0 with a fused reduction.
+
+    advances the solution like numerov(..., full=False) and accumulates
+    a reduction over all solution values in the same sweep, so the full
+    solution is never stored.
+
+    Parameters
+    ----------
+    q : array-like
+        function q(x) discretized at sampling points with one
+        independent problem per column, see numerov.
+    y0, y1 : scalar or array-like
+        initial values, broadcast against the trailing axis of q.
+    dx : scalar
+        step size to discretize functions.
+    reduce : str
+        'abs2_sum' accumulates the sum of the squared magnitudes of
+        the solution over all sampling points, 'abs2_max' their
+        maximum.
+    reverse : bool, optional
+        sweep q from its last towards its first point, see numerov.
+
+    Returns
+    -------
+    y0, y1, red : ndarray
+        last two values of the solution and the reduction per problem.
+    '''
+
+    if reduce not in ('abs2_sum', 'abs2_max'):
+        raise ValueError('reduce must be "abs2_sum" or "abs2_max"')
+
+    # number of sampling points
+    n = len(q)
+
+    # convert array-like to array
+    q = np.asarray(q)
+
+    # sweep direction through q
+    step = -1 if reverse else 1
+
+    # materialize initial values as vectors of the common type
+    dtype = np.result_type(q.dtype, np.asarray(y0).dtype,
+        np.asarray(y1).dtype)
+
+    y0 = np.broadcast_to(np.asarray(y0, dtype), q.shape[1:]).copy()
+    y1 = np.broadcast_to(np.asarray(y1, dtype), q.shape[1:]).copy()
+
+
+    if numba is not None:
+        # dispatch to jit-compiled recurrence with inlined reduction
+        q = np.ascontiguousarray(q)
+
+        if reduce == 'abs2_sum':
+            red = _numerov_abs2_sum_batch(q, y0, y1, dx, step)
+        else:
+            red = _numerov_abs2_max_batch(q, y0, y1, dx, step)
+
+        return y0, y1, red
+
+
+    # fallback mirrors the buffer-rotating loop of numerov with the
+    # reduction folded into each step
+    if reverse:
+        q = q[::-1]
+
+    # coefficients appearing in Numerov iteration
+    a = 12 + dx*dx * q
+    b = 24 - 10*dx*dx * q
+
+    inv_a = 1.0 / a
+
+    u = np.empty_like(y0)
+
+    # contribution of the initial values
+    red0 = y0.real**2 + y0.imag**2
+    red1 = y1.real**2 + y1.imag**2
+
+    if reduce == 'abs2_sum':
+        red = red0 + red1
+    else:
+        red = np.maximum(red0, red1)
+
+    # iterate Numerov algorithm (see numerov) and fold each new value
+    # into the running reduction
+    for i in range(2, n):
+        np.multiply(b[i-1], y1, out=u)
+        np.multiply(a[i-2], y0, out=y0)
+        np.subtract(u, y0, out=u)
+        np.multiply(u, inv_a[i], out=u)
+
+        y0, y1, u = y1, u, y0
+
+        if reduce == 'abs2_sum':
+            red += y1.real**2 + y1.imag**2
+        else:
+            np.maximum(red, y1.real**2 + y1.imag**2, out=red)
+
+    return y0, y1, red
+
+
+
+def _full_buffer(q, y0, y1, out):
+    '''returns buffer for the full solution seeded with initial values.
+
+    allocates an array of the common type of the arguments unless the
+    caller passed a buffer to reuse.
+    '''
+
+    # extract more general type. initial values may carry additional
+    # dimensions (e.g. energy) that broadcast against the shape of q
+    dtype = np.result_type(q.dtype, np.asarray(y0).dtype,
+        np.asarray(y1).dtype)
+
+    if out is None:
+        y = np.empty(q.shape, dtype)
+
+    else:
+        # the jitted kernels write to the buffer without bounds checks,
+        # so unsuitable buffers must be rejected up front
+        if out.shape != q.shape:
+            raise ValueError('out must match the shape of q')
+
+        if not np.can_cast(dtype, out.dtype, casting='same_kind'):
+            raise ValueError(
+                'out cannot hold solution values of type {}'.format(dtype))
+
+        y = out
+
+    y[0] = y0
+    y[1] = y1
+
+    return y
+
+
+
+def numerov_matrix(q, y0, y1, dx):
+    '''integrate ode y''(x) + q(x)*y(x) = 0 as banded linear system.
+
+    equivalent to numerov(q, y0, y1, dx, full=True): the recurrence
+    a[i]*y[i] = b[i-1]*y[i-1] - a[i-2]*y[i-2] together with the initial
+    values forms a lower-triangular system with bandwidth three, which
+    a single LAPACK call solves without any Python-level iteration.
+    requires scipy.
+
+    Parameters
+    ----------
+    q : array-like
+        function q(x) discretized at sampling points
+        x_m = m * dx with m = 0 ... n-1.
+    y0, y1 : scalar
+        initial values given by y0 = y(0) and y1 = y(dx).
+    dx : scalar
+        step size to discretize functions.
+    '''
+
+    from scipy.linalg import solve_banded
+
+    # number of sampling points
+    n = len(q)
+
+    # convert array-like to array
+    q = np.asarray(q)
+
+    # coefficients appearing in Numerov iteration
+    a = 12 + dx*dx * q
+    b = 24 - 10*dx*dx * q
+
+    # extract more general type
+    dtype = np.result_type(q.dtype, np.asarray(y0).dtype,
+        np.asarray(y1).dtype)
+
+
+    # banded system in matrix diagonal ordered form. the first two rows
+    # of the system pin the initial values, the remaining rows state
+    # the recurrence
+    ab = np.zeros((3, n), dtype=dtype)
+    ab[0, 0:2] = 1
+    ab[0, 2:] = a[2:]
+    ab[1, 1:-1] = -b[1:-1]
+    ab[2, :-2] = a[:-2]
+
+    # right hand side carries the initial values
+    s = np.zeros(n, dtype=dtype)
+    s[0] = y0
+    s[1] = y1
+
+    return solve_banded((2, 0), ab, s)
@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+
+
+'''small numerical helper functions.'''
+
+
+
+
+import numpy as np
+
+
+def abs2(z):
+    '''returns squared magnitude |z|^2 computed in a single pass.
+
+    avoids the square root and one temporary array compared to the
+    expression np.abs(z)**2.
+
+    Parameters
+    ----------
+    z : array-like
+        real or complex values.
+    '''
+
+    # convert array-like to array
+    z = np.asarray(z)
+
+    if np.iscomplexobj(z):
+        return z.real*z.real + z.imag*z.imag
+
+    return z*z